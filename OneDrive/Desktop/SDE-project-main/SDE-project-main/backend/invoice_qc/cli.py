@@ -1,8 +1,9 @@
 """CLI interface for invoice QC service"""
 import typer
-import json
+import orjson
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+from pydantic import TypeAdapter
 from .extractor import InvoiceExtractor
 from .validator import InvoiceValidator
 from .models import Invoice
@@ -12,11 +13,15 @@ app = typer.Typer(
     help="Invoice Quality Control Service - Extract and validate invoice data from PDFs"
 )
 
+# Parses and validates a JSON list of invoices in a single pydantic-core call
+_invoice_list_adapter = TypeAdapter(List[Invoice])
+
 
 @app.command()
 def extract(
     pdf_dir: Path = typer.Option(..., "--pdf-dir", help="Directory containing PDF invoices"),
     output: Path = typer.Option(..., "--output", help="Output JSON file for extracted data"),
+    workers: Optional[int] = typer.Option(None, "--workers", help="Number of extraction processes (default: CPU count)"),
 ):
     """Extract invoice data from PDFs"""
     if not pdf_dir.exists():
@@ -26,14 +31,13 @@ def extract(
     typer.secho(f"\n⚙️  Extracting invoices from {pdf_dir}...", fg=typer.colors.CYAN)
     
     extractor = InvoiceExtractor()
-    invoices = extractor.extract_from_directory(pdf_dir)
+    invoices = extractor.extract_from_directory(pdf_dir, workers=workers)
     
     # Convert to JSON
     invoices_data = [inv.model_dump() for inv in invoices]
     
     # Save to file
-    with open(output, 'w') as f:
-        json.dump(invoices_data, f, indent=2)
+    _write_json(output, invoices_data)
     
     typer.secho(f"\n✅ Extracted {len(invoices)} invoices", fg=typer.colors.GREEN)
     typer.secho(f"✅ Saved to {output}", fg=typer.colors.GREEN)
@@ -52,18 +56,14 @@ def validate(
     typer.secho(f"\n⚙️  Validating invoices from {input}...", fg=typer.colors.CYAN)
     
     # Load invoices
-    with open(input, 'r') as f:
-        invoices_data = json.load(f)
-    
-    invoices = [Invoice(**inv_data) for inv_data in invoices_data]
+    invoices = _invoice_list_adapter.validate_json(input.read_bytes())
     
     # Validate
     validator = InvoiceValidator()
     validation_report = validator.validate_invoices(invoices)
     
     # Save report
-    with open(report, 'w') as f:
-        json.dump(validation_report.model_dump(), f, indent=2)
+    _write_json(report, validation_report.model_dump())
     
     # Print summary
     _print_summary(validation_report)
@@ -80,6 +80,7 @@ def full_run(
     pdf_dir: Path = typer.Option(..., "--pdf-dir", help="Directory containing PDF invoices"),
     report: Path = typer.Option(..., "--report", help="Output JSON file for validation report"),
     save_extracted: Optional[Path] = typer.Option(None, "--save-extracted", help="Optionally save extracted data"),
+    workers: Optional[int] = typer.Option(None, "--workers", help="Number of extraction processes (default: CPU count)"),
 ):
     """Extract and validate invoices in one step"""
     if not pdf_dir.exists():
@@ -91,14 +92,13 @@ def full_run(
     # Extract
     typer.secho(f"\n[1/2] Extracting invoices from {pdf_dir}...", fg=typer.colors.BLUE)
     extractor = InvoiceExtractor()
-    invoices = extractor.extract_from_directory(pdf_dir)
+    invoices = extractor.extract_from_directory(pdf_dir, workers=workers)
     typer.secho(f"  ✓ Extracted {len(invoices)} invoices", fg=typer.colors.GREEN)
     
     # Save extracted data if requested
     if save_extracted:
         invoices_data = [inv.model_dump() for inv in invoices]
-        with open(save_extracted, 'w') as f:
-            json.dump(invoices_data, f, indent=2)
+        _write_json(save_extracted, invoices_data)
         typer.secho(f"  ✓ Saved extracted data to {save_extracted}", fg=typer.colors.GREEN)
     
     # Validate
@@ -107,8 +107,7 @@ def full_run(
     validation_report = validator.validate_invoices(invoices)
     
     # Save report
-    with open(report, 'w') as f:
-        json.dump(validation_report.model_dump(), f, indent=2)
+    _write_json(report, validation_report.model_dump())
     
     # Print summary
     _print_summary(validation_report)
@@ -120,6 +119,12 @@ def full_run(
         raise typer.Exit(1)
 
 
+def _write_json(path: Path, data):
+    """Write data to a JSON file with 2-space indentation"""
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+
 def _print_summary(report):
     """Print validation summary to console"""
     summary = report.summary
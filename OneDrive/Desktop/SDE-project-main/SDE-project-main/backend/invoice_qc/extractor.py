@@ -1,50 +1,348 @@
 """PDF extraction module - converts PDF invoices to structured JSON"""
 import pdfplumber
+import pypdfium2 as pdfium
+from pdfminer.pdffont import PDFFont
+from pdfminer.pdfinterp import PDFResourceManager
+from pdfminer.psparser import PSLiteral
+import io
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache, partial
+from itertools import repeat
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Union, Iterator
 from .models import Invoice, LineItem
 import logging
 
+try:
+    import hyperscan
+except ImportError:  # Optional: speeds up field extraction when installed
+    hyperscan = None
+
 logger = logging.getLogger(__name__)
 
+# A PDF given either by path or by its already-read contents
+PdfSource = Union[Path, bytes]
+
+
+# Field patterns are written as text but compiled as bytes patterns and run
+# against the UTF-8 encoded document. Currency symbols are multi-byte in UTF-8,
+# so they are matched with an alternation rather than a character class.
+def _compile(pattern: str, flags: int = re.IGNORECASE) -> re.Pattern:
+    """Compile a pattern string as a bytes pattern"""
+    return re.compile(pattern.encode('utf-8'), flags)
+
+
+def _compile_all(patterns: Tuple[str, ...], flags: int = re.IGNORECASE) -> Tuple[re.Pattern, ...]:
+    """Compile pattern strings once at import time"""
+    return tuple(_compile(p, flags) for p in patterns)
+
+
+# Characters that str-mode \s matches but bytes-mode \s does not: the ASCII
+# separators 0x1c-0x1f, replaced in the encoded bytes, and non-ASCII spaces
+_ASCII_SEPARATORS = bytes.maketrans(b'\x1c\x1d\x1e\x1f', b'    ')
+_UNICODE_SPACES = dict.fromkeys(
+    map(ord, '\x85\xa0\u1680\u2028\u2029\u202f\u205f\u3000'), ' '
+)
+_UNICODE_SPACES.update(dict.fromkeys(range(0x2000, 0x200b), ' '))
+
+
+def _encode_text(text: str) -> bytes:
+    r"""Encode document text for the bytes patterns
+    
+    Whitespace that bytes-mode \s doesn't match (e.g. non-breaking spaces)
+    becomes a plain space so that \s keeps matching it.
+    """
+    if not text.isascii():
+        text = text.translate(_UNICODE_SPACES)
+    return text.encode('utf-8').translate(_ASCII_SEPARATORS)
+
+
+def _group_text(match: re.Match, text: str, data: bytes) -> str:
+    """Return group 1 of a match against data = _encode_text(text), as written in text
+    
+    The group is sliced from text rather than decoded, so spaces that
+    _encode_text replaced keep their original character. Each of those
+    replacements swaps one character for one, so character offsets agree.
+    """
+    start, end = match.span(1)
+    if len(data) != len(text):  # Multi-byte characters shift the byte offsets
+        start = len(data[:start].decode('utf-8'))
+        end = start + len(match.group(1).decode('utf-8'))
+    return text[start:end]
+
+
+# Financial total patterns
+_SUBTOTAL_RE = _compile(r'(?:Subtotal|Net\s+Total|Net)\s*:?\s*(?:€|\$|£|¥)?\s*([0-9,]+\.?\d{0,2})')
+_TAX_RE = _compile(r'(?:Tax|VAT|GST)(?:\s+Amount)?\s*:?\s*(?:€|\$|£|¥)?\s*([0-9,]+\.?\d{0,2})')
+_TOTAL_RE = _compile(r'(?:Total|Grand\s+Total|Amount\s+Due)\s*:?\s*(?:€|\$|£|¥)?\s*([0-9,]+\.?\d{0,2})')
+_PAYMENT_TERMS_RE = _compile(r'(?:Payment\s+Terms|Terms)\s*:?\s*([^\n]+)')
+
+
+# Seller and buyer sections open with a header word and run until a blank
+# line or a line starting with one of their terminators
+_SELLER_HEADERS = ('from', 'seller', 'vendor', 'supplier')
+_SELLER_TERMINATORS = ('to', 'bill', 'customer')
+_BUYER_HEADERS = ('bill to', 'to', 'customer', 'buyer')
+_BUYER_TERMINATORS = ('invoice', 'date')
+
+
+def _section_start(line: str, headers: Tuple[str, ...]) -> Optional[str]:
+    """Return the rest of a line that opens with a header word, or None"""
+    lowered = line.lower()
+    for header in headers:
+        if lowered.startswith(header):
+            rest = line[len(header):]
+            if not rest[:1].isalnum():  # "To:" opens a section, "Total" does not
+                return rest.lstrip(' \t:')
+    return None
+
+
+def _find_section(lines: List[str], headers: Tuple[str, ...],
+                  terminators: Tuple[str, ...]) -> Optional[List[str]]:
+    """Collect the non-empty lines of the first section opened by a header
+    
+    A single forward pass over the lines, so unlike a regex with nested
+    repetition it cannot backtrack on pathological text.
+    """
+    for idx, line in enumerate(lines):
+        first = _section_start(line.strip(), headers)
+        if first is None:
+            continue
+        
+        section = [first] if first else []
+        for line in lines[idx + 1:]:
+            line = line.strip()
+            if not line:
+                if section:
+                    break
+                continue  # The header can sit alone above its section
+            if section and line.lower().startswith(terminators):
+                break
+            section.append(line)
+        return section or None
+    return None
+
+
+# Date formats accepted by _normalize_date, keyed by their first separator.
+# A date can only match formats whose first separator is the first one it contains.
+_DATE_FORMATS_BY_SEPARATOR = {
+    '/': ('%d/%m/%Y', '%m/%d/%Y'),
+    '-': ('%Y-%m-%d', '%d-%m-%Y'),
+    '.': ('%d.%m.%Y',),
+    ' ': ('%d %B %Y', '%d %b %Y'),
+}
+_DATE_SEPARATOR_RE = re.compile(r'[/.\-\s]')
+
+
+def _build_field_database(alternatives: Tuple[Tuple[str, int, re.Pattern], ...]):
+    """Compile every field pattern into one Hyperscan database
+    
+    Returns None when Hyperscan is not installed or rejects a pattern, in
+    which case fields are searched with re.
+    """
+    if hyperscan is None:
+        return None
+    
+    flags = []
+    for _, _, pattern in alternatives:
+        flag = hyperscan.HS_FLAG_SOM_LEFTMOST  # Report where each match starts
+        if pattern.flags & re.IGNORECASE:
+            flag |= hyperscan.HS_FLAG_CASELESS
+        if pattern.flags & re.MULTILINE:
+            flag |= hyperscan.HS_FLAG_MULTILINE
+        flags.append(flag)
+    
+    database = hyperscan.Database()
+    try:
+        database.compile(
+            expressions=[pattern.pattern for _, _, pattern in alternatives],
+            ids=list(range(len(alternatives))),
+            elements=len(alternatives),
+            flags=flags,
+        )
+    except hyperscan.error as e:
+        logger.warning(f"Hyperscan could not compile the field patterns, falling back to re: {e}")
+        return None
+    return database
+
+
+# _extract_line_items only accepts tables whose header has one of these
+_LINE_ITEM_TOKENS = ('description', 'item', 'product')
+
+# Line item table columns, in the order they are matched against a header
+_QUANTITY_TOKENS = ('qty', 'quantity')
+_TOTAL_TOKENS = ('total', 'amount')
+
+# A line item table also needs a quantity or price column
+_QUANTITY_HEADER_TOKENS = ('qty', 'quantity', 'amount')
+_PRICE_HEADER_TOKENS = ('price', 'rate', 'unit')
+
+
+def _contains_any(text: str, tokens: Tuple[str, ...]) -> bool:
+    """Check whether any token occurs in text"""
+    return any(token in text for token in tokens)
+
+
+def _column_field(col_name: str) -> Optional[str]:
+    """Map a lowercased table header cell to a LineItem field"""
+    if _contains_any(col_name, _LINE_ITEM_TOKENS):
+        return 'description'
+    if _contains_any(col_name, _QUANTITY_TOKENS):
+        return 'quantity'
+    if 'unit' in col_name and 'price' in col_name:
+        return 'unit_price'
+    if _contains_any(col_name, _TOTAL_TOKENS):
+        return 'line_total'
+    return None
+
+
+def _extract_page_texts(source: PdfSource) -> List[str]:
+    """Extract the raw text of every page with PDFium
+    
+    Much faster than pdfplumber's layout-based extract_text, which is only
+    needed for tables.
+    """
+    with pdfium.PdfDocument(source) as pdf:
+        return [
+            page.get_textpage().get_text_range().replace('\r\n', '\n')
+            for page in pdf
+        ]
+
+
+def _has_line_item_header(text: str) -> bool:
+    """Check whether a page's text could contain a line-item table header"""
+    return _contains_any(text.lower(), _LINE_ITEM_TOKENS)
+
+
+# pdfminer caches fonts per document by object id. A font whose spec holds
+# only direct values (like the standard 14 fonts used by generated invoices)
+# is fully described by that spec, so one instance is shared by every document
+# a process opens. Fonts that refer to document objects (embedded font files,
+# ToUnicode streams) stay in the per-document cache.
+_SHARED_FONTS: Dict[Any, PDFFont] = {}
+_SHARED_FONTS_MAX = 1024
+_UNSHAREABLE = object()
+
+
+def _font_key(value: Any) -> Any:
+    """Return a hashable form of a font spec, or _UNSHAREABLE"""
+    if isinstance(value, dict):
+        items = []
+        for key, item in value.items():
+            item = _font_key(item)
+            if item is _UNSHAREABLE:
+                return _UNSHAREABLE
+            items.append((key, item))
+        return tuple(sorted(items))
+    if isinstance(value, list):
+        items = tuple(_font_key(item) for item in value)
+        return _UNSHAREABLE if _UNSHAREABLE in items else items
+    if isinstance(value, (PSLiteral, str, bytes, int, float)):
+        return value
+    return _UNSHAREABLE
+
+
+class _SharedFontResourceManager(PDFResourceManager):
+    """Resource manager that reuses fonts across documents where that is safe"""
+    
+    def get_font(self, objid: object, spec: Dict[str, Any]) -> PDFFont:
+        key = _font_key(spec)
+        if key is _UNSHAREABLE:
+            return super().get_font(objid, spec)
+        
+        font = _SHARED_FONTS.get(key)
+        if font is None:
+            font = super().get_font(None, spec)
+            if len(_SHARED_FONTS) < _SHARED_FONTS_MAX:
+                _SHARED_FONTS[key] = font
+        return font
+
+
+def _extract_page_tables(source: PdfSource, page_numbers: List[int]) -> List[List[List[List[str]]]]:
+    """Extract tables from the given pages with pdfplumber - also runs in worker processes
+    
+    page_numbers are 0-based and ascending. Only those pages are opened:
+    pdf.pages would otherwise build a Page object for every page of the
+    document, in every worker batch.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    with pdfplumber.open(source, pages=[number + 1 for number in page_numbers]) as pdf:
+        pdf.rsrcmgr = _SharedFontResourceManager()
+        return [page.extract_tables() or [] for page in pdf.pages]
+
 
 class InvoiceExtractor:
     """Extract structured data from invoice PDFs"""
     
-    # Common patterns for invoice fields
-    INVOICE_NUMBER_PATTERNS = [
+    # Common patterns for invoice fields (compiled once at import)
+    INVOICE_NUMBER_PATTERNS = _compile_all((
         r'Invoice\s*(?:Number|No\.?|#)\s*:?\s*([A-Z0-9-]+)',
         r'Invoice\s+([A-Z0-9-]+)',
         r'INV[-\s]*([0-9]+)',
-    ]
+    ))
     
-    DATE_PATTERNS = [
+    DATE_PATTERNS = _compile_all((
         r'(?:Invoice\s+)?Date\s*:?\s*(\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4})',
         r'Date\s*:?\s*(\d{4}[-/.]\d{2}[-/.]\d{2})',
         r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4})',
-    ]
+    ))
     
-    DUE_DATE_PATTERNS = [
+    DUE_DATE_PATTERNS = _compile_all((
         r'(?:Due\s+)?(?:Date|By)\s*:?\s*(\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4})',
         r'Payment\s+Due\s*:?\s*(\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4})',
         r'Due\s*:?\s*(\d{4}[-/.]\d{2}[-/.]\d{2})',
-    ]
+    ))
     
-    AMOUNT_PATTERNS = [
-        r'(?:Total|Amount|Sum)\s*:?\s*([A-Z]{3})?\s*([€$£¥])?\s*([0-9,]+\.?\d{0,2})',
-        r'([€$£¥])\s*([0-9,]+\.?\d{0,2})',
-    ]
+    AMOUNT_PATTERNS = _compile_all((
+        r'(?:Total|Amount|Sum)\s*:?\s*([A-Z]{3})?\s*(€|\$|£|¥)?\s*([0-9,]+\.?\d{0,2})',
+        r'(€|\$|£|¥)\s*([0-9,]+\.?\d{0,2})',
+    ))
     
-    CURRENCY_PATTERNS = [
+    # Currency codes are matched case-sensitively
+    CURRENCY_PATTERNS = _compile_all((
         r'\b(USD|EUR|GBP|INR|JPY|CNY|CAD|AUD)\b',
-        r'([€$£¥])',
-    ]
+        r'(€|\$|£|¥)',
+    ), flags=0)
     
-    TAX_ID_PATTERNS = [
+    TAX_ID_PATTERNS = _compile_all((
         r'(?:VAT|Tax|GST)\s*(?:ID|No|Number)?\s*:?\s*([A-Z0-9]+)',
         r'Tax\s+ID\s*:?\s*([A-Z0-9-]+)',
-    ]
+    ))
+    
+    # Fields read from the full text, each with its patterns in priority order
+    FIELD_PATTERNS = (
+        ('invoice_number', INVOICE_NUMBER_PATTERNS),
+        ('invoice_date', DATE_PATTERNS),
+        ('due_date', DUE_DATE_PATTERNS),
+        ('currency', CURRENCY_PATTERNS),
+        ('net_total', (_SUBTOTAL_RE,)),
+        ('tax_amount', (_TAX_RE,)),
+        ('gross_total', (_TOTAL_RE,)),
+        ('payment_terms', (_PAYMENT_TERMS_RE,)),
+    )
+    FIELD_ALTERNATIVES = tuple(
+        (name, priority, pattern)
+        for name, patterns in FIELD_PATTERNS
+        for priority, pattern in enumerate(patterns)
+    )
+    FIELD_DATABASE = _build_field_database(FIELD_ALTERNATIVES)
+    
+    # Directories with at most this many PDFs are extracted in-process
+    SERIAL_MAX_FILES = 2
+    
+    # When at least PARALLEL_MIN_PAGES pages need table extraction they are split
+    # into batches of PAGE_BATCH_SIZE pages, each processed in its own worker process
+    PARALLEL_MIN_PAGES = 20
+    PAGE_BATCH_SIZE = 10
+    
+    # When extracting a directory serially, read this many upcoming PDFs on a
+    # background thread while the current one is parsed
+    PREFETCH_FILES = 4
     
     def __init__(self):
         self.currency_map = {
@@ -54,197 +352,264 @@ class InvoiceExtractor:
             '¥': 'JPY',
         }
     
-    def extract_from_pdf(self, pdf_path: Path) -> Invoice:
-        """Extract invoice data from a single PDF file"""
+    def extract_from_pdf(self, pdf_path: Path, data: Optional[bytes] = None,
+                         workers: Optional[int] = None) -> Invoice:
+        """Extract invoice data from a single PDF file
+        
+        If the file's contents were already read, pass them as `data` to
+        parse from memory instead of reopening pdf_path. The pages of a large
+        PDF are extracted across up to `workers` processes (defaults to the
+        CPU count); callers that already run this in a worker process pass
+        workers=1, so it doesn't start a nested pool of its own.
+        """
+        source = pdf_path if data is None else data
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                # Extract text from all pages
-                full_text = ''
-                tables = []
-                
-                for page in pdf.pages:
-                    full_text += page.extract_text() or ''
-                    page_tables = page.extract_tables()
-                    if page_tables:
-                        tables.extend(page_tables)
-                
-                # Extract structured data
-                invoice_data = {
-                    'source_file': pdf_path.name,
-                    'invoice_number': self._extract_invoice_number(full_text),
-                    'invoice_date': self._extract_invoice_date(full_text),
-                    'due_date': self._extract_due_date(full_text),
-                    'currency': self._extract_currency(full_text),
-                }
-                
-                # Extract seller and buyer information
-                seller_info, buyer_info = self._extract_parties(full_text)
-                invoice_data.update(seller_info)
-                invoice_data.update(buyer_info)
-                
-                # Extract financial totals
-                financial_data = self._extract_financials(full_text)
-                invoice_data.update(financial_data)
-                
-                # Extract line items from tables
-                line_items = self._extract_line_items(tables, full_text)
-                invoice_data['line_items'] = line_items
-                
-                return Invoice(**invoice_data)
-                
+            # Extract text from all pages
+            page_texts = _extract_page_texts(source)
+            full_text = ''.join(page_texts)
+            
+            # Table extraction is the most expensive step, so only run it on
+            # pages whose text could contain a line-item table header
+            table_pages = [
+                number for number, text in enumerate(page_texts)
+                if _has_line_item_header(text)
+            ]
+            tables = []
+            for page_tables in self._extract_tables(pdf_path, source, table_pages, workers):
+                tables.extend(page_tables)
+            
+            # Extract identifiers, dates, parties and totals in one pass
+            invoice_data = {'source_file': pdf_path.name}
+            invoice_data.update(self._extract_fields(full_text))
+            
+            # Extract line items from tables
+            line_items = self._extract_line_items(tables, full_text)
+            invoice_data['line_items'] = line_items
+            
+            return Invoice(**invoice_data)
+            
         except Exception as e:
             logger.error(f"Error extracting {pdf_path}: {e}")
             return Invoice(source_file=pdf_path.name)
     
-    def extract_from_directory(self, pdf_dir: Path) -> List[Invoice]:
-        """Extract invoices from all PDFs in a directory"""
-        invoices = []
-        pdf_files = list(pdf_dir.glob('*.pdf'))
+    def _extract_tables(self, pdf_path: Path, source: PdfSource, page_numbers: List[int],
+                        workers: Optional[int] = None) -> List[List[List[List[str]]]]:
+        """Extract tables from the given pages, in page order"""
+        if not page_numbers:
+            return []
+        
+        workers = workers or os.cpu_count() or 1
+        if len(page_numbers) < self.PARALLEL_MIN_PAGES or workers < 2:
+            return _extract_page_tables(source, page_numbers)
+        
+        # Process page batches of a large PDF across worker processes
+        batches = [
+            page_numbers[start:start + self.PAGE_BATCH_SIZE]
+            for start in range(0, len(page_numbers), self.PAGE_BATCH_SIZE)
+        ]
+        with ProcessPoolExecutor(max_workers=min(len(batches), workers)) as executor:
+            results = executor.map(_extract_page_tables, repeat(pdf_path), batches)
+            return [page_tables for batch in results for page_tables in batch]
+    
+    def extract_from_directory(self, pdf_dir: Path, workers: Optional[int] = None) -> List[Invoice]:
+        """Extract invoices from all PDFs in a directory
+        
+        PDFs are extracted in parallel across `workers` processes (defaults to
+        the CPU count). Results keep the directory listing order.
+        """
+        pdf_files = self._list_pdfs(pdf_dir)
+        workers = workers or os.cpu_count() or 1
         
         logger.info(f"Found {len(pdf_files)} PDF files in {pdf_dir}")
         
-        for pdf_file in pdf_files:
-            logger.info(f"Extracting {pdf_file.name}...")
-            invoice = self.extract_from_pdf(pdf_file)
-            invoices.append(invoice)
+        # Pool startup costs more than it saves for a couple of files
+        if workers > 1 and len(pdf_files) > self.SERIAL_MAX_FILES:
+            logger.info(f"Extracting with {workers} worker processes...")
+            # About four chunks per worker keeps the load balanced without
+            # paying inter-process overhead for every file. The workers
+            # already use every core, so each extracts its pages serially.
+            chunksize = max(1, len(pdf_files) // (workers * 4))
+            extract = partial(self.extract_from_pdf, workers=1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(extract, pdf_files, chunksize=chunksize))
         
-        return invoices
-    
-    def _extract_invoice_number(self, text: str) -> Optional[str]:
-        """Extract invoice number from text"""
-        for pattern in self.INVOICE_NUMBER_PATTERNS:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        return None
+        return [
+            self.extract_from_pdf(pdf_file, data, workers)
+            for pdf_file, data in self._prefetch(pdf_files)
+        ]
     
-    def _extract_invoice_date(self, text: str) -> Optional[str]:
-        """Extract invoice date from text"""
-        for pattern in self.DATE_PATTERNS:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return self._normalize_date(match.group(1))
-        return None
+    @staticmethod
+    def _list_pdfs(pdf_dir: Path) -> List[Path]:
+        """List the PDF files directly inside a directory
+        
+        Uses os.scandir with a suffix check rather than glob pattern matching.
+        The suffix match ignores case, as glob does on Windows.
+        """
+        with os.scandir(pdf_dir) as entries:
+            return [
+                Path(entry.path) for entry in entries
+                if entry.name.lower().endswith('.pdf') and entry.is_file()
+            ]
     
-    def _extract_due_date(self, text: str) -> Optional[str]:
-        """Extract due date from text"""
-        for pattern in self.DUE_DATE_PATTERNS:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return self._normalize_date(match.group(1))
-        return None
+    def _prefetch(self, pdf_files: List[Path]) -> Iterator[Tuple[Path, Optional[bytes]]]:
+        """Yield each PDF with its contents, reading ahead on a background thread
+        
+        At most PREFETCH_FILES reads are in flight, so file I/O overlaps with
+        parsing without holding the whole directory in memory. A file that
+        can't be read yields None and is left to extract_from_pdf to report.
+        """
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            pending = deque(
+                reader.submit(Path.read_bytes, pdf_file)
+                for pdf_file in pdf_files[:self.PREFETCH_FILES]
+            )
+            
+            for idx, pdf_file in enumerate(pdf_files):
+                future = pending.popleft()
+                upcoming = idx + self.PREFETCH_FILES
+                if upcoming < len(pdf_files):
+                    pending.append(reader.submit(Path.read_bytes, pdf_files[upcoming]))
+                
+                try:
+                    data = future.result()
+                except OSError:
+                    data = None
+                logger.info(f"Extracting {pdf_file.name}...")
+                yield pdf_file, data
     
-    def _normalize_date(self, date_str: str) -> str:
-        """Normalize date to YYYY-MM-DD format"""
-        # Try to parse common formats
-        from datetime import datetime
+    def _scan_fields(self, text: bytes) -> Dict[str, re.Match]:
+        """Find the winning match for every field
         
-        date_formats = [
-            '%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d',
-            '%d-%m-%Y', '%d.%m.%Y',
-            '%d %B %Y', '%d %b %Y',
-        ]
+        Each field's patterns are tried in priority order: the first pattern
+        that matches anywhere wins, at its leftmost position.
+        """
+        if self.FIELD_DATABASE is not None:
+            return self._scan_fields_hyperscan(text)
         
-        for fmt in date_formats:
-            try:
-                dt = datetime.strptime(date_str.strip(), fmt)
-                return dt.strftime('%Y-%m-%d')
-            except:
-                continue
+        # Plain re is faster pattern by pattern than as one fused alternation,
+        # which measured about 3x slower on real invoices
+        found = {}
+        for name, patterns in self.FIELD_PATTERNS:
+            for pattern in patterns:
+                if match := pattern.search(text):
+                    found[name] = match
+                    break
+        return found
+    
+    def _scan_fields_hyperscan(self, text: bytes) -> Dict[str, re.Match]:
+        """Find every field's winning match with one Hyperscan pass over the text
         
-        return date_str
+        Hyperscan reports where each pattern matches but not its groups, so the
+        winning pattern is re-run with re at its leftmost start.
+        """
+        starts: Dict[int, int] = {}
+        
+        def on_match(idx, start, end, flags, context):
+            if start < starts.get(idx, start + 1):
+                starts[idx] = start
+        
+        self.FIELD_DATABASE.scan(text, match_event_handler=on_match)
+        
+        # Ids follow FIELD_PATTERNS order, so a field's first hit has the highest priority
+        found = {}
+        for idx in sorted(starts):
+            name, _, pattern = self.FIELD_ALTERNATIVES[idx]
+            if name not in found:
+                if match := pattern.search(text, starts[idx]):
+                    found[name] = match
+        return found
     
-    def _extract_currency(self, text: str) -> Optional[str]:
-        """Extract currency code from text"""
-        # Look for currency codes
-        for pattern in self.CURRENCY_PATTERNS:
-            match = re.search(pattern, text)
-            if match:
-                currency = match.group(1)
-                if currency in self.currency_map:
-                    return self.currency_map[currency]
-                return currency
-        return None
+    def _extract_fields(self, text: str) -> Dict[str, Any]:
+        """Extract header, party and financial fields from text"""
+        data = _encode_text(text)
+        fields = {
+            'invoice_number': None,
+            'invoice_date': None,
+            'due_date': None,
+            'currency': None,
+        }
+        
+        for name, match in self._scan_fields(data).items():
+            value = _group_text(match, text, data)
+            if name in ('invoice_date', 'due_date'):
+                fields[name] = self._normalize_date(value)
+            elif name == 'currency':
+                fields[name] = self.currency_map.get(value, value)
+            elif name in ('net_total', 'tax_amount', 'gross_total'):
+                fields[name] = self._parse_amount(value)
+            else:
+                fields[name] = value.strip()
+        
+        fields.update(self._extract_parties(text))
+        return fields
     
-    def _extract_parties(self, text: str) -> tuple[Dict[str, Any], Dict[str, Any]]:
+    def _extract_parties(self, text: str) -> Dict[str, Any]:
         """Extract seller and buyer information"""
-        seller_info = {}
-        buyer_info = {}
+        lines = text.splitlines()
+        info = {}
+        for party, headers, terminators in (
+            ('seller', _SELLER_HEADERS, _SELLER_TERMINATORS),
+            ('buyer', _BUYER_HEADERS, _BUYER_TERMINATORS),
+        ):
+            section = _find_section(lines, headers, terminators)
+            if section:
+                info.update(self._parse_party(party, section))
+        return info
+    
+    # Amount and date strings repeat heavily across a batch of invoices, so the
+    # pure parsers below are memoized (static so the cache doesn't hold self)
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _normalize_date(date_str: str) -> str:
+        """Normalize date to YYYY-MM-DD format"""
+        cleaned = date_str.strip()
+        separator = _DATE_SEPARATOR_RE.search(cleaned)
+        if not separator:
+            return date_str
         
-        # Look for seller/buyer sections
-        seller_section = re.search(
-            r'(?:From|Seller|Vendor|Supplier)\s*:?\s*([^\n]+(?:\n(?!(?:To|Bill|Customer))[^\n]+)*)',
-            text, re.IGNORECASE | re.MULTILINE
-        )
+        # strptime treats a space in the format as any run of whitespace
+        sep = ' ' if separator.group().isspace() else separator.group()
         
-        buyer_section = re.search(
-            r'(?:To|Bill\s+To|Customer|Buyer)\s*:?\s*([^\n]+(?:\n(?!(?:Invoice|Date))[^\n]+)*)',
-            text, re.IGNORECASE | re.MULTILINE
-        )
+        # Try only the formats that use this separator
+        for fmt in _DATE_FORMATS_BY_SEPARATOR[sep]:
+            try:
+                dt = datetime.strptime(cleaned, fmt)
+                return dt.strftime('%Y-%m-%d')
+            except ValueError:
+                continue
         
-        if seller_section:
-            seller_text = seller_section.group(1)
-            lines = [l.strip() for l in seller_text.split('\n') if l.strip()]
-            seller_info['seller_name'] = lines[0] if lines else None
-            seller_info['seller_address'] = ' '.join(lines[1:3]) if len(lines) > 1 else None
-            
-            # Extract tax ID
-            tax_id = self._extract_tax_id(seller_text)
-            if tax_id:
-                seller_info['seller_tax_id'] = tax_id
+        return date_str
+    
+    def _parse_party(self, party: str, lines: List[str]) -> Dict[str, Any]:
+        """Extract name, address and tax ID from the lines of a seller or buyer section"""
+        info = {}
+        info[f'{party}_name'] = lines[0] if lines else None
+        info[f'{party}_address'] = ' '.join(lines[1:3]) if len(lines) > 1 else None
         
-        if buyer_section:
-            buyer_text = buyer_section.group(1)
-            lines = [l.strip() for l in buyer_text.split('\n') if l.strip()]
-            buyer_info['buyer_name'] = lines[0] if lines else None
-            buyer_info['buyer_address'] = ' '.join(lines[1:3]) if len(lines) > 1 else None
-            
-            # Extract tax ID
-            tax_id = self._extract_tax_id(buyer_text)
-            if tax_id:
-                buyer_info['buyer_tax_id'] = tax_id
+        # Extract tax ID
+        tax_id = self._extract_tax_id('\n'.join(lines))
+        if tax_id:
+            info[f'{party}_tax_id'] = tax_id
         
-        return seller_info, buyer_info
+        return info
     
     def _extract_tax_id(self, text: str) -> Optional[str]:
         """Extract tax ID from text"""
+        data = _encode_text(text)
         for pattern in self.TAX_ID_PATTERNS:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
+            if match := pattern.search(data):
+                return _group_text(match, text, data).strip()
         return None
     
-    def _extract_financials(self, text: str) -> Dict[str, Any]:
-        """Extract financial amounts from text"""
-        financials = {}
-        
-        # Extract various totals
-        subtotal_match = re.search(r'(?:Subtotal|Net\s+Total|Net)\s*:?\s*[€$£¥]?\s*([0-9,]+\.?\d{0,2})', text, re.IGNORECASE)
-        if subtotal_match:
-            financials['net_total'] = self._parse_amount(subtotal_match.group(1))
-        
-        tax_match = re.search(r'(?:Tax|VAT|GST)(?:\s+Amount)?\s*:?\s*[€$£¥]?\s*([0-9,]+\.?\d{0,2})', text, re.IGNORECASE)
-        if tax_match:
-            financials['tax_amount'] = self._parse_amount(tax_match.group(1))
-        
-        total_match = re.search(r'(?:Total|Grand\s+Total|Amount\s+Due)\s*:?\s*[€$£¥]?\s*([0-9,]+\.?\d{0,2})', text, re.IGNORECASE)
-        if total_match:
-            financials['gross_total'] = self._parse_amount(total_match.group(1))
-        
-        # Extract payment terms
-        payment_terms = re.search(r'(?:Payment\s+Terms|Terms)\s*:?\s*([^\n]+)', text, re.IGNORECASE)
-        if payment_terms:
-            financials['payment_terms'] = payment_terms.group(1).strip()
-        
-        return financials
-    
-    def _parse_amount(self, amount_str: str) -> float:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _parse_amount(amount_str: str) -> float:
         """Parse amount string to float"""
         # Remove commas and convert to float
         cleaned = amount_str.replace(',', '').strip()
         try:
             return float(cleaned)
-        except:
+        except ValueError:
             return 0.0
     
     def _extract_line_items(self, tables: List[List[List[str]]], text: str) -> List[LineItem]:
@@ -259,54 +624,60 @@ class InvoiceExtractor:
             if len(table) < 2:  # Need at least header + 1 row
                 continue
             
+            # Convert and strip every cell once; empty cells stay None
+            rows = [[str(cell).strip() if cell else None for cell in row] for row in table]
+            
             # Check if this looks like a line items table
-            header = [str(cell).lower() if cell else '' for cell in table[0]]
+            header = [cell.lower() if cell else '' for cell in rows[0]]
             
             # Look for common column names
-            has_description = any('description' in h or 'item' in h or 'product' in h for h in header)
-            has_quantity = any('qty' in h or 'quantity' in h or 'amount' in h for h in header)
-            has_price = any('price' in h or 'rate' in h or 'unit' in h for h in header)
+            has_description = any(_contains_any(h, _LINE_ITEM_TOKENS) for h in header)
+            has_quantity = any(_contains_any(h, _QUANTITY_HEADER_TOKENS) for h in header)
+            has_price = any(_contains_any(h, _PRICE_HEADER_TOKENS) for h in header)
             
             if has_description and (has_quantity or has_price):
+                # Resolve each column to a LineItem field once per table
+                columns = {}
+                for idx, col_name in enumerate(header):
+                    field = _column_field(col_name)
+                    if field:
+                        columns[idx] = field
+                
                 # Parse line items
-                for row in table[1:]:
-                    if not row or all(not cell for cell in row):
+                for row in rows[1:]:
+                    if all(cell is None for cell in row):
                         continue
                     
-                    item = self._parse_line_item_row(row, header)
+                    item = self._parse_line_item_row(row, columns)
                     if item.description:  # Only add if we got at least a description
                         line_items.append(item)
         
         return line_items
     
-    def _parse_line_item_row(self, row: List[str], header: List[str]) -> LineItem:
-        """Parse a single line item row"""
-        item = LineItem()
+    def _parse_line_item_row(self, row: List[Optional[str]], columns: Dict[int, str]) -> LineItem:
+        """Parse a single line item row
+        
+        `row` holds stripped cell text (None for empty cells) and `columns`
+        maps column indices to LineItem fields, in column order.
+        """
+        # Collect fields first and build the model once; assigning attributes
+        # one by one goes through pydantic's __setattr__ for every field
+        fields: Dict[str, Any] = {}
         
-        for idx, cell in enumerate(row):
-            if not cell or idx >= len(header):
+        for idx, field in columns.items():
+            if idx >= len(row) or row[idx] is None:
                 continue
             
-            cell = str(cell).strip()
-            col_name = header[idx]
+            cell = row[idx]
             
-            # Match column to field
-            if 'description' in col_name or 'item' in col_name or 'product' in col_name:
-                item.description = cell
-            elif 'qty' in col_name or 'quantity' in col_name:
-                try:
-                    item.quantity = float(cell.replace(',', ''))
-                except:
-                    pass
-            elif 'unit' in col_name and 'price' in col_name:
-                try:
-                    item.unit_price = self._parse_amount(cell)
-                except:
-                    pass
-            elif 'total' in col_name or 'amount' in col_name:
+            if field == 'description':
+                fields[field] = cell
+            elif field == 'quantity':
                 try:
-                    item.line_total = self._parse_amount(cell)
-                except:
+                    fields[field] = float(cell.replace(',', ''))
+                except ValueError:
                     pass
+            else:
+                fields[field] = self._parse_amount(cell)
         
-        return item
+        return LineItem(**fields)
@@ -1,21 +1,113 @@
 """Validation rules for invoice quality control"""
-from typing import List, Optional
-from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from datetime import date, datetime
+from functools import lru_cache
+from operator import attrgetter
+import sys
+import numpy as np
 from .models import Invoice, ValidationError
 import re
 
 
+# Every format datetime.fromisoformat accepts starts with a four-digit year
+_ISO_YEAR_RE = re.compile(r'[0-9]{4}')
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(date_str: str) -> Optional[date]:
+    """Parse an ISO date string, or return None if it isn't one
+    
+    Plain dates parse to a date and only strings with a time part to a
+    datetime. Cached because the same dates are parsed by several rules and
+    recur across a batch of invoices.
+    """
+    # Dates the extractor couldn't normalize (e.g. 15/01/2024) are rejected
+    # without raising and catching an exception
+    if not _ISO_YEAR_RE.match(date_str):
+        return None
+    # Checked first as the dates the extractor produces look like this. Only
+    # the extended YYYY-MM-DD form: on Python 3.11 date.fromisoformat also
+    # accepts some 10-character strings that datetime.fromisoformat rejects.
+    if len(date_str) == 10 and date_str[4] == '-':
+        try:
+            return date.fromisoformat(date_str)
+        except (ValueError, TypeError):
+            pass
+    try:
+        return datetime.fromisoformat(date_str)
+    except (ValueError, TypeError):
+        return None
+
+
+def _as_datetime(value: date) -> datetime:
+    """Promote a date to midnight so it can be compared with a datetime"""
+    if isinstance(value, datetime):
+        return value
+    return datetime(value.year, value.month, value.day)
+
+
+class InvoiceContext:
+    """One invoice under validation, with its dates parsed once for every rule
+    
+    When the invoice is validated as part of a batch, position is its index
+    in all_invoices and batch maps each rule to what its prepare() returned.
+    """
+    
+    __slots__ = ('invoice', 'invoice_dt', 'due_dt', 'all_invoices', 'position', 'batch')
+    
+    def __init__(self, invoice: Invoice, all_invoices: List[Invoice] = None,
+                 position: Optional[int] = None, batch: Optional[Dict['ValidationRule', Any]] = None):
+        self.invoice = invoice
+        self.all_invoices = all_invoices
+        self.position = position
+        self.batch = batch
+        # None when the date is missing or not ISO formatted
+        self.invoice_dt = _parse_iso(invoice.invoice_date) if invoice.invoice_date else None
+        self.due_dt = _parse_iso(invoice.due_date) if invoice.due_date else None
+
+
 class ValidationRule:
     """Base class for validation rules"""
     
     def __init__(self, name: str, description: str, severity: str = 'error'):
-        self.name = name
+        self.name = sys.intern(name)  # Copied into every error this rule reports
         self.description = description
         self.severity = severity  # 'error' or 'warning'
     
+    def prepare(self, all_invoices: List[Invoice]) -> Any:
+        """Precompute batch-wide data before the batch is validated
+        
+        Called once per batch by InvoiceValidator, which hands the result to
+        check() through InvoiceContext.batch; rules that don't look across
+        invoices need not override it.
+        """
+        return None
+    
     def validate(self, invoice: Invoice, all_invoices: List[Invoice] = None) -> List[ValidationError]:
         """Validate invoice and return list of errors"""
         raise NotImplementedError
+    
+    def check(self, ctx: InvoiceContext) -> List[ValidationError]:
+        """Validate the invoice in ctx; used by InvoiceValidator
+        
+        Rules that use the parsed dates or prepared batch data override this,
+        the rest keep validate() as their only entry point.
+        """
+        return self.validate(ctx.invoice, ctx.all_invoices)
+    
+    def _prepared(self, ctx: InvoiceContext) -> Any:
+        """Return what prepare() computed for ctx's batch, or None outside a batch"""
+        if ctx.batch is None:
+            return None
+        return ctx.batch.get(self)
+
+
+def _amounts(invoices: List[Invoice], field: str) -> np.ndarray:
+    """Gather one amount field of every invoice, with NaN for missing values"""
+    return np.fromiter(
+        (np.nan if (value := getattr(inv, field)) is None else value for inv in invoices),
+        dtype=np.float64, count=len(invoices)
+    )
 
 
 class RequiredFieldRule(ValidationRule):
@@ -26,20 +118,25 @@ class RequiredFieldRule(ValidationRule):
             'required_fields',
             'Core invoice fields must be present and non-empty'
         )
-        self.required_fields = [
+        self.required_fields = (
             'invoice_number',
             'invoice_date',
             'seller_name',
             'buyer_name',
             'currency',
             'gross_total',
-        ]
+        )
+        self._getters = tuple((field, attrgetter(field)) for field in self.required_fields)
     
     def validate(self, invoice: Invoice, all_invoices: List[Invoice] = None) -> List[ValidationError]:
         errors = []
         
-        for field in self.required_fields:
-            value = getattr(invoice, field, None)
+        # Values are read directly rather than consulting model_fields_set
+        # first: the extractor explicitly sets missing fields to None, so
+        # "set" fields still need their value checked, and the extra set
+        # lookup made the common all-present case slower
+        for field, get in self._getters:
+            value = get(invoice)
             if value is None or (isinstance(value, str) and not value.strip()):
                 errors.append(ValidationError(
                     rule=self.name,
@@ -60,11 +157,15 @@ class DateFormatRule(ValidationRule):
         )
     
     def validate(self, invoice: Invoice, all_invoices: List[Invoice] = None) -> List[ValidationError]:
+        return self.check(InvoiceContext(invoice, all_invoices))
+    
+    def check(self, ctx: InvoiceContext) -> List[ValidationError]:
         errors = []
+        invoice = ctx.invoice
         
         # Check invoice_date
         if invoice.invoice_date:
-            if not self._is_valid_date(invoice.invoice_date):
+            if not self._in_range(ctx.invoice_dt):
                 errors.append(ValidationError(
                     rule=self.name,
                     message=f"Invalid invoice_date format: {invoice.invoice_date}",
@@ -73,7 +174,7 @@ class DateFormatRule(ValidationRule):
         
         # Check due_date
         if invoice.due_date:
-            if not self._is_valid_date(invoice.due_date):
+            if not self._in_range(ctx.due_dt):
                 errors.append(ValidationError(
                     rule=self.name,
                     message=f"Invalid due_date format: {invoice.due_date}",
@@ -82,26 +183,24 @@ class DateFormatRule(ValidationRule):
         
         return errors
     
-    def _is_valid_date(self, date_str: str) -> bool:
-        """Check if date string is valid"""
-        try:
-            dt = datetime.fromisoformat(date_str)
-            # Check reasonable range
-            return 1900 <= dt.year <= 2100
-        except:
-            return False
+    @staticmethod
+    def _in_range(dt: Optional[date]) -> bool:
+        """Check that a parsed date exists and is within a reasonable range"""
+        return dt is not None and 1900 <= dt.year <= 2100
 
 
 class CurrencyValidationRule(ValidationRule):
     """Rule: Currency must be from a known set"""
     
-    VALID_CURRENCIES = {'EUR', 'USD', 'GBP', 'INR', 'JPY', 'CNY', 'CAD', 'AUD', 'CHF', 'SEK'}
+    VALID_CURRENCIES = frozenset({'EUR', 'USD', 'GBP', 'INR', 'JPY', 'CNY', 'CAD', 'AUD', 'CHF', 'SEK'})
     
     def __init__(self):
         super().__init__(
             'currency_validation',
             'Currency must be a recognized ISO code'
         )
+        # Listed in every error message, so built once
+        self._valid_list_str = ', '.join(sorted(self.VALID_CURRENCIES))
     
     def validate(self, invoice: Invoice, all_invoices: List[Invoice] = None) -> List[ValidationError]:
         errors = []
@@ -109,7 +208,7 @@ class CurrencyValidationRule(ValidationRule):
         if invoice.currency and invoice.currency not in self.VALID_CURRENCIES:
             errors.append(ValidationError(
                 rule=self.name,
-                message=f"Unknown currency code: {invoice.currency}. Valid: {', '.join(sorted(self.VALID_CURRENCIES))}",
+                message=f"Unknown currency code: {invoice.currency}. Valid: {self._valid_list_str}",
                 field='currency'
             ))
         
@@ -126,21 +225,30 @@ class DueDateRule(ValidationRule):
         )
     
     def validate(self, invoice: Invoice, all_invoices: List[Invoice] = None) -> List[ValidationError]:
+        return self.check(InvoiceContext(invoice, all_invoices))
+    
+    def check(self, ctx: InvoiceContext) -> List[ValidationError]:
         errors = []
+        invoice = ctx.invoice
         
         if invoice.invoice_date and invoice.due_date:
+            invoice_dt, due_dt = ctx.invoice_dt, ctx.due_dt
+            if invoice_dt is None or due_dt is None:
+                return errors  # Date format errors caught by DateFormatRule
+            
+            # A date can't be compared with a datetime, so compare both at full precision
+            if type(invoice_dt) is not type(due_dt):
+                invoice_dt, due_dt = _as_datetime(invoice_dt), _as_datetime(due_dt)
+            
             try:
-                invoice_dt = datetime.fromisoformat(invoice.invoice_date)
-                due_dt = datetime.fromisoformat(invoice.due_date)
-                
                 if due_dt < invoice_dt:
                     errors.append(ValidationError(
                         rule=self.name,
                         message=f"Due date ({invoice.due_date}) is before invoice date ({invoice.invoice_date})",
                         field='due_date'
                     ))
-            except:
-                pass  # Date format errors caught by DateFormatRule
+            except TypeError:
+                pass  # Timezone-aware and naive dates can't be compared
         
         return errors
 
@@ -155,6 +263,26 @@ class TotalsMatchRule(ValidationRule):
         )
         self.tolerance = tolerance
     
+    def prepare(self, all_invoices: List[Invoice]) -> FrozenSet[int]:
+        """Compare the totals of the whole batch in one vectorized pass
+        
+        Returns the positions of the invoices whose totals don't match.
+        """
+        net = _amounts(all_invoices, 'net_total')
+        tax = _amounts(all_invoices, 'tax_amount')
+        gross = _amounts(all_invoices, 'gross_total')
+        
+        # Missing amounts are NaN, and NaN never compares greater
+        with np.errstate(invalid='ignore', over='ignore'):
+            mismatched = np.abs(net + tax - gross) > self.tolerance
+        return frozenset(np.flatnonzero(mismatched).tolist())
+    
+    def check(self, ctx: InvoiceContext) -> List[ValidationError]:
+        mismatched = self._prepared(ctx)
+        if mismatched is not None and ctx.position not in mismatched:
+            return []
+        return self.validate(ctx.invoice, ctx.all_invoices)
+    
     def validate(self, invoice: Invoice, all_invoices: List[Invoice] = None) -> List[ValidationError]:
         errors = []
         
@@ -183,6 +311,40 @@ class LineItemsTotalRule(ValidationRule):
         )
         self.tolerance = tolerance
     
+    def prepare(self, all_invoices: List[Invoice]) -> Dict[int, float]:
+        """Compare the line item sums of the whole batch in one vectorized pass
+        
+        Returns the line item sum of each mismatched invoice, by position.
+        """
+        # Sums keep sum()'s left-to-right order: NumPy's SIMD reduction rounds
+        # differently, which can move a sum across the tolerance
+        positions, line_sums = [], []
+        for position, inv in enumerate(all_invoices):
+            if inv.net_total is not None and inv.line_items:
+                positions.append(position)
+                line_sums.append(sum(
+                    item.line_total for item in inv.line_items
+                    if item.line_total is not None
+                ))
+        
+        if not positions:
+            return {}
+        
+        sums = np.array(line_sums, dtype=np.float64)
+        net = _amounts([all_invoices[position] for position in positions], 'net_total')
+        with np.errstate(invalid='ignore', over='ignore'):
+            mismatched = (sums > 0) & (np.abs(sums - net) > self.tolerance)
+        
+        return {positions[idx]: float(sums[idx]) for idx in np.flatnonzero(mismatched).tolist()}
+    
+    def check(self, ctx: InvoiceContext) -> List[ValidationError]:
+        mismatched_sums = self._prepared(ctx)
+        if mismatched_sums is None:
+            return self.validate(ctx.invoice, ctx.all_invoices)
+        if ctx.position not in mismatched_sums:
+            return []
+        return [self._mismatch_error(mismatched_sums[ctx.position], ctx.invoice.net_total)]
+    
     def validate(self, invoice: Invoice, all_invoices: List[Invoice] = None) -> List[ValidationError]:
         errors = []
         
@@ -197,13 +359,17 @@ class LineItemsTotalRule(ValidationRule):
                 difference = abs(line_items_sum - invoice.net_total)
                 
                 if difference > self.tolerance:
-                    errors.append(ValidationError(
-                        rule=self.name,
-                        message=f"Line items sum ({line_items_sum:.2f}) doesn't match net_total ({invoice.net_total:.2f}), diff: {difference:.2f}",
-                        field='line_items'
-                    ))
+                    errors.append(self._mismatch_error(line_items_sum, invoice.net_total))
         
         return errors
+    
+    def _mismatch_error(self, line_items_sum: float, net_total: float) -> ValidationError:
+        difference = abs(line_items_sum - net_total)
+        return ValidationError(
+            rule=self.name,
+            message=f"Line items sum ({line_items_sum:.2f}) doesn't match net_total ({net_total:.2f}), diff: {difference:.2f}",
+            field='line_items'
+        )
 
 
 class NegativeAmountsRule(ValidationRule):
@@ -214,14 +380,14 @@ class NegativeAmountsRule(ValidationRule):
             'no_negative_amounts',
             'Invoice amounts should not be negative'
         )
+        amount_fields = ('net_total', 'tax_amount', 'gross_total')
+        self._getters = tuple((field, attrgetter(field)) for field in amount_fields)
     
     def validate(self, invoice: Invoice, all_invoices: List[Invoice] = None) -> List[ValidationError]:
         errors = []
         
-        amount_fields = ['net_total', 'tax_amount', 'gross_total']
-        
-        for field in amount_fields:
-            value = getattr(invoice, field, None)
+        for field, get in self._getters:
+            value = get(invoice)
             if value is not None and value < 0:
                 errors.append(ValidationError(
                     rule=self.name,
@@ -241,23 +407,46 @@ class DuplicateInvoiceRule(ValidationRule):
             'Invoices should not have duplicate invoice numbers from same seller on same date'
         )
     
-    def validate(self, invoice: Invoice, all_invoices: List[Invoice] = None) -> List[ValidationError]:
-        errors = []
+    @staticmethod
+    def _key(invoice: Invoice) -> Tuple:
+        return (invoice.invoice_number, invoice.seller_name, invoice.invoice_date)
+    
+    def prepare(self, all_invoices: List[Invoice]) -> Dict[Tuple, List[str]]:
+        """Index the batch's source files by invoice number, seller and date"""
+        index: Dict[Tuple, List[str]] = {}
+        for inv in all_invoices or ():
+            index.setdefault(self._key(inv), []).append(inv.source_file)
+        return index
+    
+    def check(self, ctx: InvoiceContext) -> List[ValidationError]:
+        index = self._prepared(ctx)
+        if index is None:
+            return self.validate(ctx.invoice, ctx.all_invoices)
         
+        invoice = ctx.invoice
+        if not ctx.all_invoices or not invoice.invoice_number:
+            return []
+        return self._duplicate_errors(invoice, index.get(self._key(invoice), ()))
+    
+    def validate(self, invoice: Invoice, all_invoices: List[Invoice] = None) -> List[ValidationError]:
         if not all_invoices or not invoice.invoice_number:
-            return errors
+            return []
+        
+        key = self._key(invoice)
+        return self._duplicate_errors(invoice, [
+            inv.source_file for inv in all_invoices if self._key(inv) == key
+        ])
+    
+    def _duplicate_errors(self, invoice: Invoice, source_files: List[str]) -> List[ValidationError]:
+        """Report the invoice if any of the files with its key is a different file"""
+        errors = []
         
-        # Find duplicates
-        duplicates = [
-            inv for inv in all_invoices
-            if inv.invoice_number == invoice.invoice_number
-            and inv.seller_name == invoice.seller_name
-            and inv.invoice_date == invoice.invoice_date
-            and inv.source_file != invoice.source_file  # Different file
+        dup_files = [
+            source_file for source_file in source_files
+            if source_file != invoice.source_file  # Different file
         ]
         
-        if duplicates:
-            dup_files = [inv.source_file for inv in duplicates]
+        if dup_files:
             errors.append(ValidationError(
                 rule=self.name,
                 message=f"Duplicate invoice detected. Same invoice_number ({invoice.invoice_number}) from {invoice.seller_name} on {invoice.invoice_date}. Duplicates in: {', '.join(dup_files)}",
@@ -268,7 +457,7 @@ class DuplicateInvoiceRule(ValidationRule):
 
 
 # All available rules
-ALL_RULES = [
+ALL_RULES = (
     RequiredFieldRule(),
     DateFormatRule(),
     CurrencyValidationRule(),
@@ -277,4 +466,4 @@ ALL_RULES = [
     LineItemsTotalRule(),
     NegativeAmountsRule(),
     DuplicateInvoiceRule(),
-]
+)
@@ -1,5 +1,6 @@
 """Validation module - validates extracted invoices against rules"""
-from typing import List
+from collections import Counter
+from typing import List, Sequence
 from .models import (
     Invoice, 
     InvoiceValidationResult, 
@@ -7,7 +8,7 @@ from .models import (
     ValidationReport,
     ValidationError
 )
-from .rules import ALL_RULES, ValidationRule
+from .rules import ALL_RULES, InvoiceContext, ValidationRule
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,26 +17,30 @@ logger = logging.getLogger(__name__)
 class InvoiceValidator:
     """Validate invoices against quality control rules"""
     
-    def __init__(self, rules: List[ValidationRule] = None):
+    def __init__(self, rules: Sequence[ValidationRule] = None):
         """Initialize validator with rules"""
-        self.rules = rules or ALL_RULES
+        self.rules = tuple(rules or ALL_RULES)
+        
+        # Severity is fixed per rule, so sort rules by it once and keep their
+        # bound check methods to call per invoice
+        self._error_checks = tuple(rule.check for rule in self.rules if rule.severity != 'warning')
+        self._warning_checks = tuple(rule.check for rule in self.rules if rule.severity == 'warning')
     
     def validate_invoice(self, invoice: Invoice, all_invoices: List[Invoice] = None) -> InvoiceValidationResult:
         """Validate a single invoice"""
+        return self._validate(InvoiceContext(invoice, all_invoices))
+    
+    def _validate(self, ctx: InvoiceContext) -> InvoiceValidationResult:
+        """Apply all rules to the invoice in ctx, sharing its parsed dates between them"""
+        invoice = ctx.invoice
         invoice_id = invoice.invoice_number or invoice.source_file or 'unknown'
         errors = []
         warnings = []
         
-        # Apply all rules
-        for rule in self.rules:
-            rule_errors = rule.validate(invoice, all_invoices)
-            
-            # Separate errors and warnings based on severity
-            for error in rule_errors:
-                if rule.severity == 'warning':
-                    warnings.append(error)
-                else:
-                    errors.append(error)
+        for check in self._error_checks:
+            errors.extend(check(ctx))
+        for check in self._warning_checks:
+            warnings.extend(check(ctx))
         
         is_valid = len(errors) == 0
         
@@ -52,9 +57,14 @@ class InvoiceValidator:
         
         results = []
         
+        # Let rules precompute anything that spans the whole batch. Kept local
+        # to this call, so validators sharing rule instances never see each
+        # other's batches
+        batch = {rule: rule.prepare(invoices) for rule in self.rules}
+        
         # Validate each invoice
-        for invoice in invoices:
-            result = self.validate_invoice(invoice, invoices)
+        for position, invoice in enumerate(invoices):
+            result = self._validate(InvoiceContext(invoice, invoices, position, batch))
             results.append(result)
         
         # Generate summary
@@ -71,18 +81,15 @@ class InvoiceValidator:
         valid = sum(1 for r in results if r.is_valid)
         invalid = total - valid
         
-        # Count error types
-        error_counts = {}
-        warning_counts = {}
-        
-        for result in results:
-            for error in result.errors:
-                key = f"{error.rule}: {error.message.split('.')[0]}"
-                error_counts[key] = error_counts.get(key, 0) + 1
-            
-            for warning in result.warnings:
-                key = f"{warning.rule}: {warning.message.split('.')[0]}"
-                warning_counts[key] = warning_counts.get(key, 0) + 1
+        # Count error types by rule and the first sentence of the message
+        error_counts = Counter(
+            f"{error.rule}: {error.message.partition('.')[0]}"
+            for result in results for error in result.errors
+        )
+        warning_counts = Counter(
+            f"{warning.rule}: {warning.message.partition('.')[0]}"
+            for result in results for warning in result.warnings
+        )
         
         return ValidationSummary(
             total_invoices=total,
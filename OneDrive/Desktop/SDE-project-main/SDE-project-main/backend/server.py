@@ -1,8 +1,14 @@
 from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+import asyncio
+import multiprocessing
 import os
 import logging
 from pathlib import Path
@@ -18,6 +24,7 @@ import shutil
 from invoice_qc.models import Invoice, ValidationReport, InvoiceValidationResult
 from invoice_qc.extractor import InvoiceExtractor
 from invoice_qc.validator import InvoiceValidator
+from invoice_qc.rules import ALL_RULES
 
 
 ROOT_DIR = Path(__file__).parent
@@ -28,8 +35,58 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# PDF extraction is CPU-bound and PDFium isn't thread-safe, so uploaded PDFs
+# are extracted in worker processes. Spawned rather than forked, since the
+# server process runs the MongoDB client's threads.
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """Return the shared extraction pool, starting it on first use"""
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+    return _extraction_pool
+
+
+def _discard_extraction_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a pool whose workers died, so the next call starts a new one"""
+    global _extraction_pool
+    if _extraction_pool is pool:
+        _extraction_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _extract_pdfs(pdf_paths: List[Path]) -> List[Invoice]:
+    """Extract PDFs in the extraction pool, keeping their order
+    
+    A worker that dies (a PDFium crash on a malformed file, an OOM kill)
+    breaks the whole pool, so the pool is replaced and the batch retried once.
+    """
+    loop = asyncio.get_running_loop()
+    # Each PDF already runs in a pool worker, so its pages are extracted serially
+    extract = partial(_EXTRACTOR.extract_from_pdf, workers=1)
+    for attempt in range(2):
+        pool = get_extraction_pool()
+        try:
+            return list(await asyncio.gather(*(
+                loop.run_in_executor(pool, extract, pdf_path)
+                for pdf_path in pdf_paths
+            )))
+        except BrokenProcessPool:
+            _discard_extraction_pool(pool)
+            if attempt:
+                raise
+            logger.warning("Extraction pool broke, retrying with a new pool")
+
+
+# Neither holds per-request state, so one instance of each serves every request
+_EXTRACTOR = InvoiceExtractor()
+_VALIDATOR = InvoiceValidator()
+
 # Create the main app without a prefix
-app = FastAPI(title="Invoice Quality Control Service")
+# Reports can hold thousands of nested errors, so responses are encoded with orjson
+app = FastAPI(title="Invoice Quality Control Service", default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -106,14 +163,19 @@ async def validate_json(request: ValidateJSONRequest):
     against the quality control rules.
     """
     try:
-        validator = InvoiceValidator()
-        report = validator.validate_invoices(request.invoices)
+        report = _VALIDATOR.validate_invoices(request.invoices)
         return report
     except Exception as e:
         logging.error(f"Validation error: {e}")
         raise HTTPException(status_code=500, detail=f"Validation failed: {str(e)}")
 
 
+def _save_upload(file: UploadFile, path: Path) -> None:
+    """Stream a spooled upload to disk instead of reading it into memory"""
+    with open(path, 'wb') as f:
+        shutil.copyfileobj(file.file, f, length=1 << 20)
+
+
 @api_router.post("/extract-and-validate", response_model=ExtractAndValidateResponse)
 async def extract_and_validate_pdfs(files: List[UploadFile] = File(...)):
     """
@@ -136,21 +198,14 @@ async def extract_and_validate_pdfs(files: List[UploadFile] = File(...)):
                 raise HTTPException(status_code=400, detail=f"File {file.filename} is not a PDF")
             
             file_path = temp_dir / file.filename
-            with open(file_path, 'wb') as f:
-                content = await file.read()
-                f.write(content)
+            await run_in_threadpool(_save_upload, file, file_path)
             pdf_paths.append(file_path)
         
-        # Extract invoices
-        extractor = InvoiceExtractor()
-        invoices = []
-        for pdf_path in pdf_paths:
-            invoice = extractor.extract_from_pdf(pdf_path)
-            invoices.append(invoice)
+        # Extract invoices in parallel, keeping upload order
+        invoices = await _extract_pdfs(pdf_paths)
         
         # Validate invoices
-        validator = InvoiceValidator()
-        report = validator.validate_invoices(invoices)
+        report = _VALIDATOR.validate_invoices(invoices)
         
         return ExtractAndValidateResponse(
             extracted_invoices=invoices,
@@ -166,16 +221,9 @@ async def extract_and_validate_pdfs(files: List[UploadFile] = File(...)):
         shutil.rmtree(temp_dir, ignore_errors=True)
 
 
-@api_router.get("/validation-rules")
-async def get_validation_rules():
-    """
-    Get information about all validation rules.
-    
-    Returns the list of rules with their descriptions.
-    """
-    from invoice_qc.rules import ALL_RULES
-    
-    rules_info = [
+# The rule set is fixed at import, so its description is built once
+_RULES_INFO = {
+    "rules": [
         {
             "name": rule.name,
             "description": rule.description,
@@ -183,8 +231,17 @@ async def get_validation_rules():
         }
         for rule in ALL_RULES
     ]
+}
+
+
+@api_router.get("/validation-rules")
+async def get_validation_rules():
+    """
+    Get information about all validation rules.
     
-    return {"rules": rules_info}
+    Returns the list of rules with their descriptions.
+    """
+    return _RULES_INFO
 
 
 # Store validation results in MongoDB
@@ -195,23 +252,47 @@ async def save_validation_result(report: ValidationReport):
     
     Useful for tracking validation history and analytics.
     """
-    doc = report.model_dump()
-    doc['timestamp'] = datetime.now(timezone.utc).isoformat()
-    doc['id'] = str(uuid.uuid4())
-    
+    doc = _report_document(report)
     await db.validation_reports.insert_one(doc)
     
     return {"id": doc['id'], "message": "Validation report saved"}
 
 
+@api_router.post("/save-validations")
+async def save_validation_results(reports: List[ValidationReport]):
+    """
+    Save several validation reports to the database in one round-trip.
+    """
+    if not reports:
+        return {"ids": [], "message": "No validation reports to save"}
+    
+    docs = [_report_document(report) for report in reports]
+    await db.validation_reports.insert_many(docs)
+    
+    return {"ids": [doc['id'] for doc in docs], "message": f"{len(docs)} validation reports saved"}
+
+
+def _report_document(report: ValidationReport) -> dict:
+    """Build the MongoDB document for a validation report"""
+    # Unset optional fields are left out to keep stored reports small
+    doc = report.model_dump(exclude_none=True)
+    doc['timestamp'] = datetime.now(timezone.utc).isoformat()
+    doc['id'] = str(uuid.uuid4())
+    return doc
+
+
 @api_router.get("/validation-history")
-async def get_validation_history(limit: int = 10):
+async def get_validation_history(limit: int = 10, include_results: bool = False):
     """
     Get recent validation reports from the database.
+    
+    Only summaries are returned unless include_results is set, since the
+    per-invoice results make up most of a stored report.
     """
+    projection = {"_id": 0} if include_results else {"_id": 0, "results": 0}
     reports = await db.validation_reports.find(
         {}, 
-        {"_id": 0}
+        projection
     ).sort("timestamp", -1).limit(limit).to_list(limit)
     
     return {"reports": reports}
@@ -235,6 +316,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_indexes():
+    # Lets validation-history read the newest reports straight off the index
+    try:
+        await db.validation_reports.create_index([("timestamp", -1)])
+    except Exception as e:
+        logger.warning(f"Could not create validation_reports index: {e}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown()